@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
+
+from collections import defaultdict
 
 import drawpia
 
 from drawpia.settings import SEP
 
 
+# a pattern to split each entry into its parts, including the whitespaces around separators.
+SEP_PATTERN = re.compile(rf'\s*{re.escape(SEP)}\s*')
+
+
 class Entry:
     """
     entry class.
@@ -14,7 +21,8 @@ class Entry:
     it represents an entry participating in drawing.
     """
 
-    def __init__(self, name, row, restricted_level=None, optional_level=None):
+    def __init__(self, name, row, restricted_level=None, optional_level=None,
+                 restricted_id=None, optional_id=None):
         """
         initializes an instance of Entry.
 
@@ -28,6 +36,14 @@ class Entry:
         :param str optional_level: a value indicating the optional level of this entry.
                                    entries which have the same optional level, would
                                    not be put in the same group unless it's not possible.
+
+        :param int restricted_id: a unique integer representing the restricted level of
+                                  this entry. it is used instead of the restricted level
+                                  itself for faster comparisons.
+
+        :param int optional_id: a unique integer representing the optional level of
+                                this entry. it is used instead of the optional level
+                                itself for faster comparisons.
         """
 
         super().__init__()
@@ -36,6 +52,17 @@ class Entry:
         self._row = row
         self._restricted_level = restricted_level
         self._optional_level = optional_level
+        self._restricted_id = restricted_id
+        self._optional_id = optional_id
+        # entries are immutable, so the hash is calculated only once.
+        self._hash = hash((row, name, restricted_level, optional_level))
+        # the string representation is also built only once.
+        self._str = f'[{row}]-[{name}]'
+        if restricted_level:
+            self._str += f'-[{restricted_level}]'
+
+        if optional_level:
+            self._str += f'-[{optional_level}]'
 
     def __hash__(self):
         """
@@ -44,7 +71,7 @@ class Entry:
         :rtype: int
         """
 
-        return hash((self._row, self._name, self._restricted_level, self._optional_level))
+        return self._hash
 
     def __eq__(self, other):
         """
@@ -58,7 +85,9 @@ class Entry:
         if not isinstance(other, Entry):
             return False
 
-        return hash(other) == hash(self)
+        return other._row == self._row and other._name == self._name and \
+            other._restricted_level == self._restricted_level and \
+            other._optional_level == self._optional_level
 
     def __ne__(self, other):
         """
@@ -111,24 +140,34 @@ class Entry:
 
         return self._optional_level
 
-    def __str__(self):
+    @property
+    def restricted_id(self):
         """
-        gets the string representation of this entry.
+        gets the restricted level id of this entry.
 
-        :rtype: str
+        :rtype: int
         """
 
-        if self._restricted_level and self._optional_level:
-            return f'[{self._row}]-[{self._name}]-' \
-                   f'[{self._restricted_level}]-[{self._optional_level}]'
+        return self._restricted_id
 
-        elif self._restricted_level:
-            return f'[{self._row}]-[{self._name}]-[{self._restricted_level}]'
+    @property
+    def optional_id(self):
+        """
+        gets the optional level id of this entry.
 
-        elif self._optional_level:
-            return f'[{self._row}]-[{self._name}]-[{self._optional_level}]'
+        :rtype: int
+        """
 
-        return f'[{self._row}]-[{self._name}]'
+        return self._optional_id
+
+    def __str__(self):
+        """
+        gets the string representation of this entry.
+
+        :rtype: str
+        """
+
+        return self._str
 
     def __repr__(self):
         """
@@ -156,8 +195,8 @@ class Extractor:
 
         root = os.path.dirname(drawpia.__file__)
         file_path = os.path.join(root, 'files', 'entries.txt')
-        self._entries, self._restricted_entries, self._optional_entries, \
-            self._restricted_count, self._optional_count = self._extract_entries(file_path)
+        self._entries, self._restricted_entries, \
+            self._optional_entries = self._extract_entries(file_path)
 
     def _extract_entries(self, file_path):
         """
@@ -166,11 +205,10 @@ class Extractor:
         :param str file_path: file path to extract entries from.
 
         :returns: a tuple containing a list of entries, a dict of restricted levels
-                  and their related entries, a dict of optional levels and their
-                  related entries, a dict of restricted levels and their entry count
-                  and a dict of optional levels and their entry count
+                  and their related entries and a dict of optional levels and their
+                  related entries
 
-        :rtype: tuple[list[Entry], dict, dict, dict, dict]
+        :rtype: tuple[list[Entry], dict, dict]
         """
 
         if not os.path.isfile(file_path):
@@ -179,79 +217,90 @@ class Extractor:
         # keeps a list of all entries.
         entries = []
         # keeps a dict of different entries based on their restricted levels.
-        restricted_entries = {}
+        restricted_entries = defaultdict(list)
         # keeps a dict of different entries based on their optional levels.
-        optional_entries = {}
-        # keeps a dict of different restricted levels and their entry count.
-        restricted_count = {}
-        # keeps a dict of different optional levels and their entry count.
-        optional_count = {}
-
-        with open(file_path) as file:
-            lines = file.readlines()
-            for index, item in enumerate(lines):
-                if not item or not item.strip() or item.strip().isspace():
+        optional_entries = defaultdict(list)
+        # keeps a dict of different restricted levels and their unique ids.
+        restricted_ids = {}
+        # keeps a dict of different optional levels and their unique ids.
+        optional_ids = {}
+
+        with open(file_path, encoding='utf-8') as file:
+            for index, item in enumerate(file):
+                stripped = item.strip()
+                if not stripped:
                     continue
 
-                parts = item.split(SEP)
+                parts = SEP_PATTERN.split(stripped)
                 name = None
                 restricted_level = None
                 optional_level = None
                 if len(parts) == 3:
-                    name = parts[0].strip()
-                    restricted_level = parts[1].strip()
-                    optional_level = parts[2].strip()
+                    name, restricted_level, optional_level = parts
 
                 elif len(parts) == 2:
-                    name = parts[0].strip()
-                    restricted_level = parts[1].strip()
+                    name, restricted_level = parts
 
                 elif len(parts) == 1:
-                    name = parts[0].strip()
+                    name = parts[0]
 
                 else:
                     ValueError(f'Invalid entry found: [{item.rstrip()}]')
 
-                if not name or name.isspace():
+                if not name:
                     raise ValueError(f'Invalid name found for entry: '
                                      f'[{index + 1}-{item.rstrip()}]')
 
-                if restricted_level and not restricted_level.isspace():
-                    restricted_level = restricted_level.strip()
-                else:
-                    restricted_level = None
+                # all parts are already stripped, so empty levels are discarded.
+                restricted_level = restricted_level or None
+                optional_level = optional_level or None
 
-                if optional_level and not optional_level.isspace():
-                    optional_level = optional_level.strip()
-                else:
-                    optional_level = None
+                # level ids start from 1, so they are always truthy.
+                restricted_id = None
+                if restricted_level:
+                    restricted_id = restricted_ids.setdefault(restricted_level,
+                                                              len(restricted_ids) + 1)
+
+                optional_id = None
+                if optional_level:
+                    optional_id = optional_ids.setdefault(optional_level,
+                                                          len(optional_ids) + 1)
 
                 entry = Entry(name, index + 1,
                               restricted_level=restricted_level,
-                              optional_level=optional_level)
+                              optional_level=optional_level,
+                              restricted_id=restricted_id,
+                              optional_id=optional_id)
 
                 entries.append(entry)
 
                 if restricted_level:
-                    restricted_items = restricted_entries.setdefault(restricted_level, [])
-                    restricted_items.append(entry)
+                    restricted_entries[restricted_level].append(entry)
 
                 if optional_level:
-                    optional_items = optional_entries.setdefault(optional_level, [])
-                    optional_items.append(entry)
+                    optional_entries[optional_level].append(entry)
 
         if not entries:
             raise ValueError('No valid entries found.')
 
-        if restricted_entries:
-            for level_name, items in restricted_entries.items():
-                restricted_count[level_name] = len(items)
+        # levels with more entries are harder to place, so they are sorted to come first.
+        # plain dicts are returned to prevent adding levels by accident on lookups.
+        return entries, self._sort_levels(restricted_entries), \
+            self._sort_levels(optional_entries)
+
+    def _sort_levels(self, level_entries):
+        """
+        sorts the given levels by the count of their entries in descending order.
+
+        levels with the same count of entries keep their original order.
+
+        :param dict level_entries: a dict of levels and their related entries.
 
-        if optional_entries:
-            for level_name, items in optional_entries.items():
-                optional_count[level_name] = len(items)
+        :rtype: dict
+        """
 
-        return entries, restricted_entries, optional_entries, restricted_count, optional_count
+        return dict(sorted(level_entries.items(),
+                           key=lambda item: len(item[1]), reverse=True))
 
     @property
     def entries(self):
@@ -291,7 +340,7 @@ class Extractor:
         :rtype: dict
         """
 
-        return self._restricted_count
+        return {level: len(items) for level, items in self._restricted_entries.items()}
 
     @property
     def optional_count(self):
@@ -301,7 +350,7 @@ class Extractor:
         :rtype: dict
         """
 
-        return self._optional_count
+        return {level: len(items) for level, items in self._optional_entries.items()}
 
     @property
     def count(self):
@@ -321,7 +370,7 @@ class Extractor:
         :rtype: bool
         """
 
-        return len(self._restricted_count) > 0
+        return len(self._restricted_entries) > 0
 
     @property
     def has_optional(self):
@@ -331,4 +380,4 @@ class Extractor:
         :rtype: bool
         """
 
-        return len(self._optional_count) > 0
+        return len(self._optional_entries) > 0
@@ -3,6 +3,8 @@
 import time
 import random
 
+from collections import deque
+
 from drawpia.extractor import Extractor, Entry
 
 
@@ -24,6 +26,10 @@ class Group:
         self._name = name
         self._size = size
         self._entries = []
+        # keeps the restricted level ids of all entries of this group.
+        self._restricted_levels = set()
+        # keeps the optional level ids of all entries of this group.
+        self._optional_levels = set()
 
     def __str__(self):
         """
@@ -50,52 +56,49 @@ class Group:
             raise ValueError(f'Entry {entry} is already added to group [{self._name}]')
 
         self._entries.append(entry)
+        if entry.restricted_id:
+            self._restricted_levels.add(entry.restricted_id)
+
+        if entry.optional_id:
+            self._optional_levels.add(entry.optional_id)
 
-    def has_restricted(self, restricted_level):
+    def has_restricted(self, restricted_id):
         """
         gets a value indicating that an entry with the given restricted level exists in group.
 
-        :param str restricted_level: restricted level to check for existence.
+        :param int restricted_id: restricted level id to check for existence.
 
         :rtype: bool
         """
 
-        if not restricted_level:
+        if not restricted_id:
             return False
 
-        for item in self._entries:
-            if item.restricted_level == restricted_level:
-                return True
+        return restricted_id in self._restricted_levels
 
-        return False
-
-    def has_optional(self, optional_level):
+    def has_optional(self, optional_id):
         """
         gets a value indicating that an entry with the given optional level exists in group.
 
-        :param str optional_level: optional level to check for existence.
+        :param int optional_id: optional level id to check for existence.
 
         :rtype: bool
         """
 
-        if not optional_level:
+        if not optional_id:
             return False
 
-        for item in self._entries:
-            if item.optional_level == optional_level:
-                return True
-
-        return False
+        return optional_id in self._optional_levels
 
     @property
     def entries(self):
         """
         gets the entries of this group.
 
-        :rtype: list[Entry]
+        :rtype: tuple[Entry]
         """
 
-        return list(self._entries)
+        return tuple(self._entries)
 
     @property
     def count(self):
@@ -178,9 +181,10 @@ class Manager:
             raise ValueError(f'Entries count is [{self._extractor.count}] which is not '
                              f'dividable by group size [{group_size}].')
 
-        total_groups = int(self._extractor.count / group_size)
+        total_groups = self._extractor.count // group_size
         if self._extractor.has_restricted:
-            for level, count in self._extractor.restricted_count.items():
+            for level, items in self._extractor.restricted_entries.items():
+                count = len(items)
                 if count > total_groups:
                     raise ValueError(f'There are [{count}] entries with restricted '
                                      f'level [{level}], but there would be only '
@@ -209,16 +213,21 @@ class Manager:
         print('Number Of Groups:')
         print(self._total_groups)
 
-    def _select(self, entries, group, picked,
+    def _select(self, sources, group, picked,
                 is_restricted=False, is_optional=False):
         """
-        selects a random entry from the list of entries and returns it.
+        selects a random entry from the list of sources and returns it.
+
+        the selected entry is removed from the sources list. entries which could
+        not be selected for the given group are kept in the sources list, but their
+        order may be changed.
 
-        it returns None if no entry can be selected and the entries list is exhausted.
+        it returns None if no entry can be selected and the sources list is exhausted.
 
-        :param list[Entry] entries: list of entries to pick from.
+        :param list[Entry] sources: list of entries to pick from.
         :param Group group: the corresponding group to pick an entry for it.
-        :param list[Entry] picked: global list of already picked entries.
+        :param bytearray picked: global mask of already picked entries,
+                                 indexed by their row numbers.
 
         :param bool is_restricted: specifies that the provided group should not have
                                    any other entry with the same restricted level as
@@ -231,20 +240,30 @@ class Manager:
         :rtype: Entry
         """
 
-        reduced_entries = list(entries)
-        if not reduced_entries:
-            return None
-
-        selected = random.choice(reduced_entries)
-        if (is_restricted and group.has_restricted(selected.restricted_level)) or \
-                (is_optional and group.has_optional(selected.optional_level)):
-            reduced_entries.remove(selected)
-            return self._select(reduced_entries, group, picked,
-                                is_restricted, is_optional)
-
-        group.add(selected)
-        picked.append(selected)
-        return selected
+        # the candidates are always kept in the head of the sources list, rejected
+        # entries are swapped to the tail so they will be available for other groups.
+        # global and bound method lookups are hoisted out of the loop.
+        randrange = random.randrange
+        has_restricted = group.has_restricted
+        has_optional = group.has_optional
+        remaining = len(sources)
+        while remaining > 0:
+            index = randrange(remaining)
+            selected = sources[index]
+            if (is_restricted and has_restricted(selected.restricted_id)) or \
+                    (is_optional and has_optional(selected.optional_id)):
+                remaining -= 1
+                sources[index] = sources[remaining]
+                sources[remaining] = selected
+                continue
+
+            group.add(selected)
+            picked[selected.row] = 1
+            sources[index] = sources[-1]
+            sources.pop()
+            return selected
+
+        return None
 
     def _draw(self):
         """
@@ -253,71 +272,66 @@ class Manager:
         :rtype: list[Group]
         """
 
-        picked = []
+        # rows of entries are increasing, so the last entry has the biggest row number.
+        picked = bytearray(self._extractor.entries[-1].row + 1)
         groups = []
         for i in range(self._total_groups):
             new_group = Group(f'Group {i + 1}', self._group_size)
             groups.append(new_group)
 
         if self._extractor.has_restricted:
-            for level, items in self._extractor.restricted_entries.items():
-                sources = list(set(items).difference(set(picked)))
-                for group in groups:
-                    if not sources:
-                        break
-
-                    if group.is_full or group.has_restricted(level):
-                        continue
+            for items in self._extractor.restricted_entries.values():
+                # all entries of the same restricted level share the same id.
+                level_id = items[0].restricted_id
+                sources = [item for item in items if not picked[item.row]]
+                # each eligible group is visited only once per level, because after
+                # that it either has an entry of this level or no entry fits in it.
+                eligible = deque(group for group in groups
+                                 if not group.is_full and not group.has_restricted(level_id))
+                while sources and eligible:
+                    group = eligible.popleft()
 
                     # we should prevent entries with the same optional
                     # level to be put in the same group.
-                    selected = self._select(sources, group, picked,
-                                            is_optional=True)
-                    if not selected:
-                        continue
-
-                    sources.remove(selected)
+                    self._select(sources, group, picked,
+                                 is_optional=True)
 
         if self._extractor.has_optional:
-            for level, items in self._extractor.optional_entries.items():
-                sources = list(set(items).difference(set(picked)))
-                for group in groups:
-                    if not sources:
-                        break
-
-                    if group.is_full or group.has_optional(level):
-                        continue
+            for items in self._extractor.optional_entries.values():
+                # all entries of the same optional level share the same id.
+                level_id = items[0].optional_id
+                sources = [item for item in items if not picked[item.row]]
+                # each eligible group is visited only once per level, because after
+                # that it either has an entry of this level or no entry fits in it.
+                eligible = deque(group for group in groups
+                                 if not group.is_full and not group.has_optional(level_id))
+                while sources and eligible:
+                    group = eligible.popleft()
 
                     # we should prevent entries with the same restricted
                     # level to be put in the same group.
-                    selected = self._select(sources, group, picked,
-                                            is_restricted=True)
-                    if not selected:
-                        continue
-
-                    sources.remove(selected)
+                    self._select(sources, group, picked,
+                                 is_restricted=True)
 
         # we should first enforce that no entries with the same optional level put
         # in the same group. but if all groups have been processed 10 times and
         # there were still some groups without enough entries, we lift the optional
         # level enforcement to be able to fill all groups.
         tried_optional = 0
-        sources = list(set(self._extractor.entries).difference(set(picked)))
-        while len(picked) < self._extractor.count:
-            for group in groups:
+        sources = [item for item in self._extractor.entries if not picked[item.row]]
+        open_groups = groups
+        while sources:
+            # each group gets at most one entry per round, so full
+            # groups only need to be dropped once before each round.
+            open_groups = [group for group in open_groups if not group.is_full]
+            is_optional = tried_optional < 10
+            for group in open_groups:
                 if not sources:
                     break
 
-                if group.is_full:
-                    continue
-
-                selected = self._select(sources, group, picked,
-                                        is_restricted=True,
-                                        is_optional=tried_optional < 10)
-                if not selected:
-                    continue
-
-                sources.remove(selected)
+                self._select(sources, group, picked,
+                             is_restricted=True,
+                             is_optional=is_optional)
 
             tried_optional += 1
 